@@ -22,10 +22,12 @@ video-progress-pkg: 灵活的视频进度条工具包
     }
     processor = VideoProgressBar(config)
     output_path = processor.process_video("input.mp4", "output.mp4")
+    
+    # 一次解码生成多个风格
+    from video_progress_pkg import process_video_multi
+    process_video_multi("input.mp4", {"a.mp4": config, "b.mp4": None})
 """
 
-from .core import VideoProgressBar, load_config, save_default_config
-
 __version__ = "1.0.0"
 __author__ = "AI Assistant"
 __email__ = ""
@@ -33,6 +35,19 @@ __description__ = "灵活的视频进度条工具包"
 
 __all__ = [
     "VideoProgressBar",
+    "process_video_multi",
     "load_config", 
     "save_default_config"
 ]
+
+
+def __getattr__(name):
+    """按需导入core模块（PEP 562），仅导入包时不加载cv2/moviepy等重量级依赖"""
+    if name in __all__:
+        from . import core
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
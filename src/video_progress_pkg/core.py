@@ -12,9 +12,13 @@ import numpy as np
 import os
 import math
 import json
+import queue
+import subprocess
+import threading
 from typing import Tuple, Optional, List, Dict, Any
 from PIL import Image, ImageSequence
 import tempfile
+from functools import lru_cache
 
 # 用于资源文件路径处理
 from importlib.resources import files
@@ -22,17 +26,253 @@ from importlib.resources import files
 # moviepy作为必需依赖
 from moviepy import VideoFileClip, ImageSequenceClip
 
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
 # 进度显示
 from tqdm import tqdm
 
 # 抑制OpenCV的FFmpeg警告信息
 os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = 'protocol_whitelist;file,rtp,udp'
 
+# 确保启用OpenCV的SIMD优化路径（部分构建默认关闭）；线程数保持OpenCV默认（全部核心）
+cv2.setUseOptimized(True)
+
 # 常量定义
 LIGHTNING_UPDATE_INTERVAL = 15  # 电光特效更新间隔（帧）
 PARTICLE_LIFE_DECAY = 1  # 粒子生命值递减
 MAX_LIGHTNING_PARTICLES = 50  # 最大电光粒子数量
 MAX_TRAIL_PARTICLES = 100  # 最大尾迹粒子数量
+MAX_PARTICLE_SIZE = 20  # 尾迹粒子最大半径（像素）
+CHARACTER_CACHE_SIZE = 16  # 已解码角色GIF的缓存数量
+SHINE_THICKNESS = 3  # 进度条发光线宽度
+TEXT_SPRITE_PADDING = 2  # 文字遮罩四周留白（像素）
+READ_QUEUE_SIZE = 8  # 解码预读队列长度（帧）
+WRITE_QUEUE_SIZE = 8  # 编码队列长度（帧）
+GRADIENT_ROW_CACHE_SIZE = 8  # 渐变颜色行缓存数量（按进度宽度）
+HARDWARE_ENCODERS = {  # encoder配置 -> ffmpeg硬件H.264编码器（auto时按此顺序探测）
+    'nvenc': 'h264_nvenc',                # NVIDIA
+    'qsv': 'h264_qsv',                    # Intel Quick Sync
+    'amf': 'h264_amf',                    # AMD
+    'videotoolbox': 'h264_videotoolbox',  # macOS
+}
+ENCODER_PRESETS = {  # 各编码器默认的preset（速度与质量的平衡点），未列出的编码器用'medium'（MoviePy总会传入-preset）
+    'libx264': 'medium',
+    'h264_nvenc': 'p4',
+    'h264_qsv': 'medium',
+}
+ENCODER_PARAMS = {  # 各编码器额外的ffmpeg参数
+    'h264_nvenc': ['-rc', 'vbr', '-cq', '23'],  # 质量优先的可变码率，码率上限仍由bitrate控制
+}
+
+
+@lru_cache(maxsize=CHARACTER_CACHE_SIZE)
+def _load_gif_frames(path: str, size: Tuple[int, int], mtime: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    解码并缩放角色GIF的所有帧，并在加载时完成Alpha预乘
+
+    按 (路径, 尺寸, 修改时间) 缓存，同一角色的多个 VideoProgressBar 实例共享结果，
+    因此返回的数组均设为只读。
+
+    Returns:
+        (预乘前景 (N, 高, 宽, 3), 背景权重 (N, 高, 宽, 1))，格式同 _premultiply_character
+    """
+    premultiplied_frames = []
+    alpha_frames = []
+    with Image.open(path) as gif:
+        print(f"🎮 加载角色GIF: {gif.size}, 帧数: {gif.n_frames}")
+        # 缩小用INTER_AREA（快且无摩尔纹），放大用INTER_LANCZOS4（保持细节）
+        shrinking = size[0] <= gif.size[0] and size[1] <= gif.size[1]
+        interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LANCZOS4
+
+        for frame_idx in range(gif.n_frames):
+            gif.seek(frame_idx)
+            frame_rgba = np.array(gif.convert('RGBA'))
+
+            # 转换颜色空间 RGBA -> BGRA，先预乘Alpha再缩放：
+            # 否则透明像素下隐藏的颜色会在缩放时渗进半透明边缘，形成色晕
+            frame_bgra = cv2.cvtColor(frame_rgba, cv2.COLOR_RGBA2BGRA).astype(np.float32)
+            frame_bgra[:, :, :3] *= frame_bgra[:, :, 3:]
+            frame_resized = cv2.resize(frame_bgra, size, interpolation=interpolation)
+
+            # 分离预乘前景和Alpha通道，并裁掉INTER_LANCZOS4放大时的振铃过冲：
+            # Alpha限制在0-255，预乘前景限制在 0 到 255*alpha 之间
+            alpha = np.clip(np.rint(frame_resized[:, :, 3:]), 0, 255)
+            premultiplied_frames.append(np.clip(np.rint(frame_resized[:, :, :3]), 0, alpha * 255))
+            alpha_frames.append(alpha)
+
+    # 与 _premultiply_character 相同的uint16定点格式：预乘前景 foreground*alpha 与背景权重 (255-alpha)
+    premultiplied = np.stack(premultiplied_frames).astype(np.uint16)
+    inv_alpha = 255 - np.stack(alpha_frames).astype(np.uint16)
+    premultiplied.flags.writeable = False
+    inv_alpha.flags.writeable = False
+    return premultiplied, inv_alpha
+
+
+def _premultiply_character(foreground: np.ndarray, alpha_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """把角色帧拆成uint16定点的预乘前景 foreground*alpha 与背景权重 (255-alpha)"""
+    alpha = np.expand_dims(alpha_mask.astype(np.uint16), axis=-1)
+    return foreground * alpha, 255 - alpha
+
+
+@lru_cache(maxsize=1)
+def _disk_stamp_table(max_radius: int = MAX_PARTICLE_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    预渲染半径 0..max_radius 的实心圆（与cv2.circle填充的像素完全一致）
+
+    Returns:
+        (dy, dx, table)：以圆心为原点的偏移网格（展平），table[r] 为半径r的像素成员掩码
+    """
+    side = 2 * max_radius + 1
+    dy, dx = np.mgrid[-max_radius:max_radius + 1, -max_radius:max_radius + 1]
+    table = np.zeros((max_radius + 1, side * side), dtype=bool)
+    for radius in range(1, max_radius + 1):
+        canvas = np.zeros((side, side), dtype=np.uint8)
+        cv2.circle(canvas, (max_radius, max_radius), radius, 255, -1)
+        table[radius] = canvas.ravel() > 0
+    return dy.ravel(), dx.ravel(), table
+
+
+def _iter_in_thread(iterable, maxsize: int = READ_QUEUE_SIZE):
+    """在后台线程中迭代iterable（如解码视频帧），通过有界队列按原顺序产出，解码与渲染并行进行"""
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    end = object()
+
+    def put(item) -> bool:
+        # 消费方提前退出时停止生产，避免线程永久阻塞在满队列上
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((end, None))
+        except Exception as e:
+            put((end, e))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                break
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+@lru_cache(maxsize=None)
+def _encoder_available(codec: str, preset: str, params: Tuple[str, ...] = ()) -> bool:
+    """
+    用与实际写入相同的编码器、preset和额外参数试编码一帧，检测能否正常启动
+
+    编译进ffmpeg但没有对应硬件、或编码器不接受该preset时都会失败。
+    """
+    cmd = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+           '-f', 'lavfi', '-i', 'color=size=256x256', '-frames:v', '1',
+           '-c:v', codec, '-preset', preset, *params, '-f', 'null', '-']
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              timeout=30).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def _select_video_codec(encoder: str, preset: Optional[str] = None) -> Tuple[str, str]:
+    """
+    根据encoder配置选择ffmpeg视频编码器及其preset
+
+    preset为None时取各编码器的默认值（ENCODER_PRESETS）。硬件编码器按实际写入参数试编码，
+    不可用或不接受该preset时回退到libx264；libx264也不接受该preset时改用其默认preset。
+    """
+    if encoder != 'libx264':
+        candidates = [HARDWARE_ENCODERS[encoder]] if encoder in HARDWARE_ENCODERS else list(HARDWARE_ENCODERS.values())
+        for codec in candidates:
+            codec_preset = preset or ENCODER_PRESETS.get(codec, 'medium')
+            if _encoder_available(codec, codec_preset, tuple(ENCODER_PARAMS.get(codec, ()))):
+                return codec, codec_preset
+
+        if encoder != 'auto':
+            print(f"⚠️ 硬件编码器 {candidates[0]} 不可用，回退到 libx264")
+
+    default_preset = ENCODER_PRESETS['libx264']
+    if preset and preset != default_preset and not _encoder_available('libx264', preset):
+        print(f"⚠️ libx264 不支持 preset={preset}，改用默认的 {default_preset}")
+        preset = None
+    return 'libx264', preset or default_preset
+
+
+def _open_writer(output_video: str, size: Tuple[int, int], fps: float, audio_file: Optional[str],
+                 encoder: str, preset: Optional[str] = None) -> '_QueuedVideoWriter':
+    """按encoder配置打开H.264视频写入器（后台线程编码，音轨直接复制）"""
+    codec, preset = _select_video_codec(encoder, preset)
+    print(f"🎞️ 视频编码器: {codec} (preset={preset})")
+    return _QueuedVideoWriter(FFMPEG_VideoWriter(
+        output_video,
+        size,
+        fps,
+        codec=codec,          # H.264编码器：libx264（高质量、兼容性好）或可用的硬件编码器
+        bitrate='10000k',     # 设置一个较高的码率 (例如 10000 kbps)。原视频码率越高，这里可以设得越高。
+        preset=preset,        # libx264默认'medium'：'slow'或'veryslow'压缩率更高但更慢，'ultrafast'最快但码率利用率低
+        threads=4,            # 使用多个CPU核心来加速编码
+        audiofile=audio_file,
+        audio_codec='copy',
+        ffmpeg_params=ENCODER_PARAMS.get(codec)
+    ))
+
+
+class _QueuedVideoWriter:
+    """后台线程写入视频帧：调用方只负责把帧放入有界队列，ffmpeg编码与渲染并行进行"""
+
+    # 同一时刻可能仍被引用的帧数上限（队列中 + 正在编码 + 调用方正在生成），
+    # 调用方轮换复用帧缓冲时，缓冲数量不能少于该值
+    PENDING_FRAMES = WRITE_QUEUE_SIZE + 2
+
+    def __init__(self, writer: FFMPEG_VideoWriter):
+        self._writer = writer
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is not None:
+                # 出错后继续取出队列中的帧，避免生产者阻塞
+                continue
+            try:
+                self._writer.write_frame(frame)
+            except Exception as e:
+                self._error = e
+
+    def write(self, frame: np.ndarray) -> None:
+        """提交一帧（RGB uint8），队列满时阻塞"""
+        if self._error is not None:
+            raise self._error
+        self._queue.put(frame)
+
+    def close(self) -> None:
+        """等待队列写完并关闭ffmpeg进程"""
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.close()
+        if self._error is not None:
+            raise self._error
 
 
 class VideoProgressBar:
@@ -81,6 +321,7 @@ class VideoProgressBar:
         self.enable_particles = config.get('enable_particles', True)
         self.particle_color = tuple(config.get('particle_color', [0, 255, 255]))
         self.particle_lifetime = config.get('particle_lifetime', 60)
+        self.random_seed = config.get('random_seed')  # 特效随机数种子（None=每次不同，整数=结果可复现）
         
         # 文字配置
         self.text_color = tuple(config.get('text_color', [0, 255, 255]))
@@ -114,6 +355,10 @@ class VideoProgressBar:
         self.gradient_enabled = config.get('gradient_enabled', True)
         self.glow_enabled = config.get('glow_enabled', True)
 
+        # 视频编码器：auto（有可用硬件编码器时优先使用）/libx264/nvenc/qsv/amf/videotoolbox
+        self.encoder = config.get('encoder', 'auto')
+        self.encoder_preset = config.get('encoder_preset')  # 编码preset（None=按编码器取默认值）
+
         # 多色渐变配置
         self.gradient_type = config.get('gradient_type', 'multi')  # linear, multi
         self.gradient_colors = config.get('gradient_colors', [
@@ -124,10 +369,34 @@ class VideoProgressBar:
         
         # 内部变量
         self.frame_count = 0
-        self.character_frames = self._load_character()
-        self.total_frames = len(self.character_frames)
-        self.lightning_particles = []
-        self.trail_particles = []
+        # 角色帧已预乘Alpha：前景*alpha 与 (255-alpha)，堆叠为连续的 (N, 高, 宽, ...) 数组按帧索引
+        self.character_premultiplied, self.character_inv_alpha = self._load_character()
+        self.total_frames = len(self.character_premultiplied)
+        self._rng = np.random.default_rng(self.random_seed)
+
+        # 电光粒子同样采用SoA结构，前 lightning_count 个为有效粒子
+        self.lightning_count = 0
+        self.lightning_x = np.zeros(MAX_LIGHTNING_PARTICLES, dtype=np.int32)
+        self.lightning_y = np.zeros(MAX_LIGHTNING_PARTICLES, dtype=np.int32)
+        self.lightning_life = np.zeros(MAX_LIGHTNING_PARTICLES, dtype=np.int32)
+        self.lightning_intensity = np.zeros(MAX_LIGHTNING_PARTICLES, dtype=np.int32)
+
+        # 尾迹粒子采用SoA结构：每个属性一个定长数组，前 trail_count 个为有效粒子
+        self.trail_count = 0
+        self.trail_x = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self.trail_y = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self.trail_drift_x = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self.trail_drift_y = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self.trail_life = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self.trail_size = np.zeros(MAX_TRAIL_PARTICLES, dtype=np.int32)
+        self._gradient_row_cache = {}
+        self._bar_background = None  # 进度条背景块，首帧时按进度条尺寸生成
+        self._bar_strip = None  # 最近一次绘制的进度条块（背景+进度填充）
+        self._bar_strip_key = None  # 对应的 (进度条宽度, 进度宽度)
+        self._shine_mask = self._create_shine_mask()  # 发光线遮罩，只渲染一次
+        self._text_sprite_cache = {}  # 进度文字遮罩缓存（"xx.x%"最多约1000种）
+        self._text_padding = self.text_outline_thickness + TEXT_SPRITE_PADDING
+        self._rgb_mode = False  # 绘制用的颜色是否已换成RGB通道顺序（见 _set_channel_order）
 
         # 性能优化：预计算渐变颜色
         self._precompute_gradient_colors()
@@ -205,6 +474,17 @@ class VideoProgressBar:
         if 'gradient_type' in config and config['gradient_type'] not in ['linear', 'multi']:
             errors.append("gradient_type 必须是 'linear' 或 'multi'")
 
+        if config.get('random_seed') is not None and (
+                not isinstance(config['random_seed'], int) or config['random_seed'] < 0):
+            errors.append("random_seed 必须是非负整数或None")
+
+        encoder_options = ['auto', 'libx264', *HARDWARE_ENCODERS]
+        if 'encoder' in config and config['encoder'] not in encoder_options:
+            errors.append(f"encoder 必须是 {', '.join(repr(e) for e in encoder_options)} 之一")
+
+        if config.get('encoder_preset') is not None and not isinstance(config['encoder_preset'], str):
+            errors.append("encoder_preset 必须是字符串或None")
+
         # 验证文件路径
         if 'character_path' in config:
             char_path = config['character_path']
@@ -221,47 +501,55 @@ class VideoProgressBar:
         """预计算渐变颜色表，提高性能"""
         if not self.gradient_enabled or self.gradient_type != 'multi':
             self.gradient_color_cache = {}
+            self.gradient_lut = None
             return
 
-        self.gradient_color_cache = {}
-        # 预计算256个颜色点
-        for i in range(256):
-            ratio = i / 255.0
-            self.gradient_color_cache[i] = self._calculate_gradient_color(ratio)
+        self.gradient_lut = self._calculate_gradient_lut()
+        # 兼容旧接口：按索引查询的颜色字典
+        self.gradient_color_cache = {i: tuple(int(c) for c in color) for i, color in enumerate(self.gradient_lut)}
 
-    def _calculate_gradient_color(self, ratio: float) -> tuple:
-        """计算渐变颜色（用于预计算）"""
-        if not self.gradient_colors or len(self.gradient_colors) < 2:
-            return self.bar_color
+    def _get_gradient_row(self, progress_width: int) -> np.ndarray:
+        """获取指定进度宽度下的渐变颜色行 (progress_width, 3)，按宽度缓存"""
+        row = self._gradient_row_cache.get(progress_width)
+        if row is not None:
+            return row
 
-        # 确保ratio在0-1范围内
-        ratio = max(0, min(1, ratio))
+        ratios = np.arange(progress_width) / progress_width
+        if self.gradient_type == 'multi':
+            # 与逐列计算一致：int(ratio * 255) 作为颜色表索引
+            row = self.gradient_lut[(ratios * 255).astype(np.intp)]
+        else:
+            # 单色渐变：亮度从60%过渡到100%
+            scale = 0.6 + 0.4 * ratios
+            row = (np.array(self.bar_color, dtype=np.float64) * scale[:, None]).astype(np.uint8)
+
+        # 淘汰最早加入的缓存项
+        if len(self._gradient_row_cache) >= GRADIENT_ROW_CACHE_SIZE:
+            self._gradient_row_cache.pop(next(iter(self._gradient_row_cache)))
+        self._gradient_row_cache[progress_width] = row
+        return row
+
+    def _calculate_gradient_lut(self) -> np.ndarray:
+        """一次性向量化计算256级多色渐变颜色表 (256, 3)"""
+        if not self.gradient_colors or len(self.gradient_colors) < 2:
+            return np.tile(np.array(self.bar_color, dtype=np.uint8), (256, 1))
 
-        # 计算在哪两个颜色之间
-        num_colors = len(self.gradient_colors)
+        # 计算每个颜色点落在哪两个颜色之间
+        colors = np.array(self.gradient_colors, dtype=np.float64)
+        num_colors = len(colors)
         segment_size = 1.0 / (num_colors - 1)
-        segment_index = int(ratio / segment_size)
+        ratios = np.arange(256) / 255.0
+        segment_index = np.minimum((ratios / segment_size).astype(np.intp), num_colors - 2)
 
-        # 防止越界
-        if segment_index >= num_colors - 1:
-            return tuple(self.gradient_colors[-1])
+        # 计算在当前段内的位置（最后一点恰好落在末尾颜色上）
+        local_ratio = (ratios - segment_index * segment_size) / segment_size
+        local_ratio[-1] = 1.0
 
-        # 计算在当前段内的位置
-        local_ratio = (ratio - segment_index * segment_size) / segment_size
-
-        # 获取当前段的起始和结束颜色
-        start_color = self.gradient_colors[segment_index]
-        end_color = self.gradient_colors[segment_index + 1]
-
-        # 线性插值计算颜色
-        interpolated_color = []
-        for i in range(3):  # BGR三个通道
-            start_val = start_color[i]
-            end_val = end_color[i]
-            interpolated_val = int(start_val + (end_val - start_val) * local_ratio)
-            interpolated_color.append(interpolated_val)
-
-        return tuple(interpolated_color)
+        # 线性插值后截断取整，与逐点 int() 的结果一致
+        start_color = colors[segment_index]
+        end_color = colors[segment_index + 1]
+        lut = (start_color + (end_color - start_color) * local_ratio[:, None]).astype(np.int64)
+        return lut.astype(np.uint8)
 
     def _get_default_character_path(self) -> str:
         """获取默认角色路径 (使用 importlib.resources)"""
@@ -276,39 +564,24 @@ class VideoProgressBar:
             print("⚠️ 无法通过 importlib.resources 定位资源文件，将使用相对路径。")
             return 'assets/characters/pikaqiu.gif'
 
-    def _load_character(self) -> List[Tuple[np.ndarray, np.ndarray]]:
-        """加载角色GIF的所有帧，包含透明遮罩"""
-        frames = []
-        
+    def _load_character(self) -> Tuple[np.ndarray, np.ndarray]:
+        """加载角色GIF的所有帧（已按透明遮罩预乘），返回 (预乘前景, 背景权重)"""
         if not os.path.exists(self.character_path):
             print(f"❌ 角色文件不存在: {self.character_path}")
-            return [(self._create_default_character(), np.ones(self.character_size[::-1], dtype=np.uint8) * 255)]
+            return self._load_default_character()
         
         try:
-            with Image.open(self.character_path) as gif:
-                print(f"🎮 加载角色GIF: {gif.size}, 帧数: {gif.n_frames}")
-                
-                for frame_idx in range(gif.n_frames):
-                    gif.seek(frame_idx)
-                    frame_rgba = gif.convert('RGBA')
-                    frame_resized = frame_rgba.resize(self.character_size, Image.Resampling.LANCZOS)
-                    frame_array = np.array(frame_resized)
-                    
-                    # 分离RGB和Alpha通道
-                    rgb_channels = frame_array[:, :, :3]
-                    alpha_channel = frame_array[:, :, 3]
-                    
-                    # 转换颜色空间 RGB -> BGR
-                    frame_bgr = cv2.cvtColor(rgb_channels, cv2.COLOR_RGB2BGR)
-                    frames.append((frame_bgr, alpha_channel))
-                    
+            mtime = os.path.getmtime(self.character_path)
+            return _load_gif_frames(self.character_path, self.character_size, mtime)
         except Exception as e:
             print(f"❌ 加载角色GIF出错: {e}")
-            default_char = self._create_default_character()
-            default_mask = np.ones(self.character_size[::-1], dtype=np.uint8) * 255
-            frames = [(default_char, default_mask)]
-            
-        return frames
+            return self._load_default_character()
+
+    def _load_default_character(self) -> Tuple[np.ndarray, np.ndarray]:
+        """默认角色（单帧、完全不透明）"""
+        default_char = self._create_default_character()
+        default_mask = np.ones(self.character_size[::-1], dtype=np.uint8) * 255
+        return _premultiply_character(default_char[np.newaxis], default_mask[np.newaxis])
 
     def _create_default_character(self) -> np.ndarray:
         """创建默认角色"""
@@ -325,132 +598,264 @@ class VideoProgressBar:
         
         return char
 
-    def _blend_with_alpha(self, background: np.ndarray, foreground: np.ndarray,
-                         alpha_mask: np.ndarray, x: int, y: int) -> np.ndarray:
-        """使用Alpha通道混合前景和背景，带边界检查"""
-        result = background.copy()
-        h, w = foreground.shape[:2]
-        bg_h, bg_w = background.shape[:2]
+    def _get_bar_background(self, bar_width: int) -> np.ndarray:
+        """获取进度条背景块（整段视频内尺寸不变，只生成一次）"""
+        shape = (self.bar_height + 1, bar_width + 1, 3)
+        if self._bar_background is None or self._bar_background.shape != shape:
+            self._bar_background = np.empty(shape, dtype=np.uint8)
+            self._bar_background[:] = self.background_color
+        return self._bar_background
+
+    def _get_bar_strip(self, bar_width: int, progress_width: int) -> np.ndarray:
+        """获取已填充进度的进度条块，只在进度宽度变化时重新填充"""
+        key = (bar_width, progress_width)
+        if self._bar_strip_key == key:
+            return self._bar_strip
+
+        background = self._get_bar_background(bar_width)
+        if self._bar_strip is None or self._bar_strip.shape != background.shape:
+            self._bar_strip = np.empty_like(background)
+        strip = self._bar_strip
+        np.copyto(strip, background)
 
-        # 确保坐标为整数
-        x, y = int(x), int(y)
+        if progress_width > 0:
+            if self.gradient_enabled:
+                # 渐变进度条（多色/单色）：整行颜色一次性广播写入
+                strip[:, :progress_width] = self._get_gradient_row(progress_width)
+            else:
+                # 纯色进度条（与cv2.rectangle一致，包含右边界列）
+                strip[:, :progress_width + 1] = self.bar_color
 
-        # 计算有效的混合区域
-        src_x1 = max(0, -x)
-        src_y1 = max(0, -y)
-        src_x2 = min(w, bg_w - x)
-        src_y2 = min(h, bg_h - y)
+        self._bar_strip_key = key
+        return strip
 
-        dst_x1 = max(0, x)
-        dst_y1 = max(0, y)
-        dst_x2 = dst_x1 + (src_x2 - src_x1)
-        dst_y2 = dst_y1 + (src_y2 - src_y1)
+    def _create_shine_mask(self) -> np.ndarray:
+        """预渲染发光线遮罩（含cv2粗线的圆形端点），左上角相对线段起点偏移 SHINE_THICKNESS"""
+        pad = SHINE_THICKNESS
+        canvas = np.zeros((self.bar_height + 1 + 2 * pad, 1 + 2 * pad), dtype=np.uint8)
+        cv2.line(canvas, (pad, pad), (pad, pad + self.bar_height), 255, SHINE_THICKNESS)
+        return canvas > 0
 
-        # 只有当有有效区域时才进行混合
-        if src_x2 > src_x1 and src_y2 > src_y1:
-            fg_region = foreground[src_y1:src_y2, src_x1:src_x2]
-            bg_region = background[dst_y1:dst_y2, dst_x1:dst_x2]
-            alpha_region = alpha_mask[src_y1:src_y2, src_x1:src_x2]
+    def _get_text_sprite(self, text: str) -> Tuple[np.ndarray, Optional[np.ndarray], Tuple[int, int]]:
+        """
+        获取进度文字的预渲染遮罩，按文字内容缓存
 
-            alpha = alpha_region.astype(float) / 255.0
-            alpha = np.expand_dims(alpha, axis=2)
+        Returns:
+            (文字遮罩, 描边遮罩或None, 文字尺寸(宽, 高))，遮罩左上角相对基线起点偏移
+            (-_text_padding, -高 - _text_padding)
+        """
+        sprite = self._text_sprite_cache.get(text)
+        if sprite is not None:
+            return sprite
+
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, self.text_size, 2)
+        pad = self._text_padding
+        shape = (text_h + baseline + 1 + 2 * pad, text_w + 1 + 2 * pad)
+        origin_x, origin_y = pad, pad + text_h
+
+        text_mask = np.zeros(shape, dtype=np.uint8)
+        cv2.putText(text_mask, text, (origin_x, origin_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, self.text_size, 255, 2)
 
-            blended = fg_region * alpha + bg_region * (1 - alpha)
-            result[dst_y1:dst_y2, dst_x1:dst_x2] = blended.astype(np.uint8)
+        outline_mask = None
+        if self.text_outline:
+            # 描边 = 文字向四周各偏移 1..thickness 像素的并集，等价于用去掉中心点的方形核膨胀一次
+            thickness = self.text_outline_thickness
+            kernel = np.ones((2 * thickness + 1, 2 * thickness + 1), dtype=np.uint8)
+            kernel[thickness, thickness] = 0  # 排除中心点
+            if kernel.any():
+                outline_mask = cv2.dilate(text_mask, kernel) > 0
+            else:
+                outline_mask = np.zeros(shape, dtype=bool)
 
-        return result
+        sprite = (text_mask > 0, outline_mask, (text_w, text_h))
+        self._text_sprite_cache[text] = sprite
+        return sprite
+
+    @staticmethod
+    def _paste_mask(frame: np.ndarray, mask: np.ndarray, color: Tuple[int, int, int], x: int, y: int) -> None:
+        """在frame的(x, y)位置按遮罩写入纯色，自动裁剪超出画面的部分"""
+        h, w = mask.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(frame_w, x + w), min(frame_h, y + h)
+        if x2 > x1 and y2 > y1:
+            frame[y1:y2, x1:x2][mask[y1 - y:y2 - y, x1 - x:x2 - x]] = color
+
+    @staticmethod
+    def _paste(frame: np.ndarray, tile: np.ndarray, x: int, y: int) -> None:
+        """将tile直接写入frame的(x, y)位置，自动裁剪超出画面的部分"""
+        h, w = tile.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(frame_w, x + w), min(frame_h, y + h)
+        if x2 > x1 and y2 > y1:
+            frame[y1:y2, x1:x2] = tile[y1 - y:y2 - y, x1 - x:x2 - x]
+
+    @staticmethod
+    def _blend_character(frame: np.ndarray, premultiplied: np.ndarray, inv_alpha: np.ndarray,
+                         x: int, y: int) -> None:
+        """将预乘后的角色帧按Alpha混合到帧上（原地修改，超出画面的部分裁剪掉）"""
+        h, w = premultiplied.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if x2 <= x1 or y2 <= y1:
+            return
+
+        roi = frame[y1:y2, x1:x2]
+        # 全程uint16定点运算：blended = 前景*a + 背景*(255-a)，最大 255*255 不会溢出
+        blended = roi * inv_alpha[y1 - y:y2 - y, x1 - x:x2 - x]
+        blended += premultiplied[y1 - y:y2 - y, x1 - x:x2 - x]
+        # 整数精确计算 blended // 255：(v + 1 + ((v + 1) >> 8)) >> 8
+        blended += 1
+        blended += blended >> 8
+        blended >>= 8
+        roi[:] = blended
+
+    def _lightning_arrays(self) -> Tuple[np.ndarray, ...]:
+        """电光粒子的全部属性数组"""
+        return (self.lightning_x, self.lightning_y, self.lightning_life, self.lightning_intensity)
 
     def _update_lightning_effects(self, char_x: int, char_y: int):
         """更新电光特效"""
         if not self.enable_lightning:
             return
 
-        # 限制粒子数量，防止内存泄漏
-        if len(self.lightning_particles) > MAX_LIGHTNING_PARTICLES:
-            self.lightning_particles = self.lightning_particles[-MAX_LIGHTNING_PARTICLES:]
-
-        if self.frame_count % LIGHTNING_UPDATE_INTERVAL == 0 and np.random.random() > (1 - self.lightning_chance):
-            lightning = {
-                'x': char_x + np.random.randint(-20, 20),
-                'y': char_y + np.random.randint(-10, 10),
-                'life': 10,
-                'intensity': np.random.randint(5, 15)
-            }
-            self.lightning_particles.append(lightning)
-
-        self.lightning_particles = [p for p in self.lightning_particles if p['life'] > 0]
-        for particle in self.lightning_particles:
-            particle['life'] -= PARTICLE_LIFE_DECAY
+        n = self.lightning_count
+        if self.frame_count % LIGHTNING_UPDATE_INTERVAL == 0 and self._rng.random() > (1 - self.lightning_chance):
+            # 达到数量上限时丢弃最早的粒子，防止内存泄漏
+            if n >= MAX_LIGHTNING_PARTICLES:
+                for arr in self._lightning_arrays():
+                    arr[:-1] = arr[1:]
+                n = MAX_LIGHTNING_PARTICLES - 1
+
+            # 一次性采样新粒子的随机属性：x/y偏移、强度
+            offset_x, offset_y, intensity = self._rng.integers([-20, -10, 5], [20, 10, 15])
+            self.lightning_x[n] = char_x + offset_x
+            self.lightning_y[n] = char_y + offset_y
+            self.lightning_life[n] = 10
+            self.lightning_intensity[n] = intensity
+            n += 1
+
+        # 移除已消亡的粒子（布尔掩码压缩）
+        alive = self.lightning_life[:n] > 0
+        if not alive.all():
+            count = int(np.count_nonzero(alive))
+            for arr in self._lightning_arrays():
+                arr[:count] = arr[:n][alive]
+            n = count
+        self.lightning_count = n
+
+        self.lightning_life[:n] -= PARTICLE_LIFE_DECAY
 
     def _draw_lightning_effects(self, frame: np.ndarray):
         """绘制电光特效"""
-        frame_h, frame_w = frame.shape[:2]
-
-        for particle in self.lightning_particles:
-            # 确保起始点在画面内
-            start_x = max(0, min(frame_w - 1, int(particle['x'])))
-            start_y = max(0, min(frame_h - 1, int(particle['y'])))
-            start_point = (start_x, start_y)
-
-            for _ in range(3):  # 使用 _ 表示不使用的循环变量
-                end_x = start_x + np.random.randint(-15, 15)
-                end_y = start_y + np.random.randint(-15, 15)
-
-                # 确保终点在画面内
-                end_x = max(0, min(frame_w - 1, end_x))
-                end_y = max(0, min(frame_h - 1, end_y))
-                end_point = (end_x, end_y)
+        n = self.lightning_count
+        if n == 0:
+            return
 
-                # 确保颜色值为整数
-                lightning_color = tuple(int(c) for c in self.lightning_color)
+        frame_h, frame_w = frame.shape[:2]
 
-                cv2.line(frame, start_point, end_point, lightning_color, 2)
-                cv2.line(frame, start_point, end_point, (255, 255, 255), 1)
+        # 确保起始点在画面内
+        start_x = np.clip(self.lightning_x[:n], 0, frame_w - 1)
+        start_y = np.clip(self.lightning_y[:n], 0, frame_h - 1)
+
+        # 每个粒子3条分支，终点偏移一次性批量采样，并确保终点在画面内
+        offsets = self._rng.integers(-15, 15, size=(n, 3, 2))
+        end_x = np.clip(start_x[:, None] + offsets[:, :, 0], 0, frame_w - 1)
+        end_y = np.clip(start_y[:, None] + offsets[:, :, 1], 0, frame_h - 1)
+
+        # 所有分支组成 (n*3, 2, 2) 的两点折线，彩色外层和白色内芯各一次polylines绘制
+        segments = np.empty((n, 3, 2, 2), dtype=np.int32)
+        segments[:, :, 0, 0] = start_x[:, None]
+        segments[:, :, 0, 1] = start_y[:, None]
+        segments[:, :, 1, 0] = end_x
+        segments[:, :, 1, 1] = end_y
+        segments = segments.reshape(-1, 2, 2)
+
+        # 确保颜色值为整数
+        lightning_color = tuple(int(c) for c in self.lightning_color)
+        cv2.polylines(frame, segments, False, lightning_color, 2)
+        cv2.polylines(frame, segments, False, (255, 255, 255), 1)
+
+    def _trail_arrays(self) -> Tuple[np.ndarray, ...]:
+        """尾迹粒子的全部属性数组"""
+        return (self.trail_x, self.trail_y, self.trail_drift_x,
+                self.trail_drift_y, self.trail_life, self.trail_size)
 
     def _update_trail_particles(self, char_x: int, char_y: int):
         """更新尾迹粒子"""
         if not self.enable_particles:
             return
 
-        # 限制粒子数量，防止内存泄漏
-        if len(self.trail_particles) > MAX_TRAIL_PARTICLES:
-            self.trail_particles = self.trail_particles[-MAX_TRAIL_PARTICLES:]
-
+        n = self.trail_count
         if self.frame_count % 5 == 0:
-            particle = {
-                'x': char_x + self.character_size[0] // 2 + np.random.randint(-5, 5),
-                'y': char_y + self.character_size[1] // 2 + np.random.randint(-5, 5),
-                'life': self.particle_lifetime,
-                'drift_x': np.random.randint(-2, 1),
-                'drift_y': np.random.randint(-2, 2),
-                'size': np.random.randint(2, 5)
-            }
-            self.trail_particles.append(particle)
-
-        self.trail_particles = [p for p in self.trail_particles if p['life'] > 0]
-        for particle in self.trail_particles:
-            particle['life'] -= PARTICLE_LIFE_DECAY
-            particle['x'] += particle['drift_x']
-            particle['y'] += particle['drift_y']
+            # 达到数量上限时丢弃最早的粒子，防止内存泄漏
+            if n >= MAX_TRAIL_PARTICLES:
+                for arr in self._trail_arrays():
+                    arr[:-1] = arr[1:]
+                n = MAX_TRAIL_PARTICLES - 1
+
+            # 一次性采样新粒子的全部随机属性：x/y抖动、x/y漂移、大小
+            jitter_x, jitter_y, drift_x, drift_y, size = self._rng.integers(
+                [-5, -5, -2, -2, 2], [5, 5, 1, 2, 5])
+            self.trail_x[n] = char_x + self.character_size[0] // 2 + jitter_x
+            self.trail_y[n] = char_y + self.character_size[1] // 2 + jitter_y
+            self.trail_drift_x[n] = drift_x
+            self.trail_drift_y[n] = drift_y
+            self.trail_life[n] = self.particle_lifetime
+            self.trail_size[n] = size
+            n += 1
+
+        # 移除已消亡的粒子（布尔掩码压缩）
+        alive = self.trail_life[:n] > 0
+        if not alive.all():
+            count = int(np.count_nonzero(alive))
+            for arr in self._trail_arrays():
+                arr[:count] = arr[:n][alive]
+            n = count
+        self.trail_count = n
+
+        # 批量更新生命值和位置
+        self.trail_life[:n] -= PARTICLE_LIFE_DECAY
+        self.trail_x[:n] += self.trail_drift_x[:n]
+        self.trail_y[:n] += self.trail_drift_y[:n]
 
     def _draw_trail_particles(self, frame: np.ndarray):
         """绘制尾迹粒子"""
-        for particle in self.trail_particles:
-            alpha = max(0.0, min(1.0, particle['life'] / self.particle_lifetime))
+        n = self.trail_count
+        if n == 0:
+            return
 
-            # 确保颜色值为整数且在有效范围内
-            color = tuple(max(0, min(255, int(c * alpha))) for c in self.particle_color)
+        alpha = np.clip(self.trail_life[:n] / self.particle_lifetime, 0.0, 1.0)
 
-            # 确保坐标和大小为整数且在有效范围内
-            x = max(0, min(frame.shape[1] - 1, int(particle['x'])))
-            y = max(0, min(frame.shape[0] - 1, int(particle['y'])))
-            size = max(1, min(20, int(particle['size'])))
+        # 确保颜色值为整数且在有效范围内
+        colors = np.clip((np.array(self.particle_color, dtype=np.float64) * alpha[:, None]).astype(np.int32), 0, 255)
 
-            cv2.circle(frame, (x, y), size, color, -1)
+        # 确保坐标和大小为整数且在有效范围内
+        frame_h, frame_w = frame.shape[:2]
+        xs = np.clip(self.trail_x[:n], 0, frame_w - 1)
+        ys = np.clip(self.trail_y[:n], 0, frame_h - 1)
+        sizes = np.clip(self.trail_size[:n], 1, MAX_PARTICLE_SIZE)
+
+        # 一次性展开所有粒子覆盖的像素并批量写入（按粒子顺序，后绘制的覆盖先绘制的）
+        dy, dx, table = _disk_stamp_table()
+        nearby = np.maximum(np.abs(dy), np.abs(dx)) <= sizes.max()
+        pixel_y = ys[:, None] + dy[nearby]
+        pixel_x = xs[:, None] + dx[nearby]
+        covered = (table[sizes][:, nearby]
+                   & (pixel_y >= 0) & (pixel_y < frame_h)
+                   & (pixel_x >= 0) & (pixel_x < frame_w))
+        pixel_colors = np.broadcast_to(colors.astype(np.uint8)[:, None, :], covered.shape + (3,))[covered]
+        pixel_y, pixel_x = pixel_y[covered], pixel_x[covered]
+
+        # 重复索引赋值的结果NumPy不作保证：每个像素只保留最后一个覆盖它的粒子，保证后绘制的覆盖先绘制的
+        _, last_reversed = np.unique((pixel_y * frame_w + pixel_x)[::-1], return_index=True)
+        last = pixel_y.size - 1 - last_reversed
+        frame[pixel_y[last], pixel_x[last]] = pixel_colors[last]
 
     def _draw_progress_bar(self, frame: np.ndarray, progress: float, width: int, height: int) -> np.ndarray:
-        """绘制灵活配置的进度条"""
-        frame_copy = frame.copy()
+        """绘制灵活配置的进度条（直接在传入的frame上绘制并返回，不再复制整帧）"""
         self.frame_count += 1
         
         # 计算进度条位置
@@ -465,47 +870,22 @@ class VideoProgressBar:
         
         # 绘制边框
         if self.border_thickness > 0:
-            cv2.rectangle(frame_copy,
+            cv2.rectangle(frame,
                          (bar_x - self.border_thickness, bar_y - self.border_thickness),
                          (bar_x + bar_width + self.border_thickness, bar_y + self.bar_height + self.border_thickness),
                          self.border_color, self.border_thickness)
 
-        # 绘制进度条背景
-        cv2.rectangle(frame_copy, (bar_x, bar_y),
-                     (bar_x + bar_width, bar_y + self.bar_height),
-                     self.background_color, -1)
-        
-        # 绘制进度
+        # 绘制进度条本体（背景+进度填充）：进度宽度不变的连续帧直接复用上一次的结果
         progress_width = int(bar_width * progress)
-        if progress_width > 0:
-            if self.gradient_enabled and self.gradient_type == 'multi':
-                # 多色渐变进度条（使用预计算的颜色）
-                for i in range(progress_width):
-                    ratio = i / progress_width if progress_width > 0 else 0
-                    # 使用预计算的颜色缓存
-                    cache_index = int(ratio * 255)
-                    color = self.gradient_color_cache.get(cache_index, self.bar_color)
-                    cv2.line(frame_copy, (bar_x + i, bar_y),
-                            (bar_x + i, bar_y + self.bar_height), color, 1)
-            elif self.gradient_enabled:
-                # 单色渐变进度条
-                for i in range(progress_width):
-                    ratio = i / progress_width if progress_width > 0 else 0
-                    color = tuple(int(c * (0.6 + 0.4 * ratio)) for c in self.bar_color)
-                    cv2.line(frame_copy, (bar_x + i, bar_y),
-                            (bar_x + i, bar_y + self.bar_height), color, 1)
-            else:
-                # 纯色进度条
-                cv2.rectangle(frame_copy, (bar_x, bar_y),
-                             (bar_x + progress_width, bar_y + self.bar_height),
-                             self.bar_color, -1)
-            
-            # 发光效果
-            if self.glow_enabled and self.frame_count % 20 < 10:
-                shine_x = bar_x + progress_width - 20
-                if shine_x > bar_x:
-                    cv2.line(frame_copy, (shine_x, bar_y), 
-                            (shine_x, bar_y + self.bar_height), (255, 255, 255), 3)
+        if bar_width >= 0:
+            self._paste(frame, self._get_bar_strip(bar_width, progress_width), bar_x, bar_y)
+
+        # 发光效果
+        if progress_width > 0 and self.glow_enabled and self.frame_count % 20 < 10:
+            shine_x = bar_x + progress_width - 20
+            if shine_x > bar_x:
+                self._paste_mask(frame, self._shine_mask, (255, 255, 255),
+                                 shine_x - SHINE_THICKNESS, bar_y - SHINE_THICKNESS)
         
         # 计算角色位置
         base_char_x = bar_x + max(0, progress_width - self.character_size[0]) + self.character_offset_x
@@ -530,24 +910,18 @@ class VideoProgressBar:
         self._update_trail_particles(char_x, char_y)
         
         # 绘制特效
-        self._draw_lightning_effects(frame_copy)
-        self._draw_trail_particles(frame_copy)
+        self._draw_lightning_effects(frame)
+        self._draw_trail_particles(frame)
         
         # 绘制角色
         if self.total_frames > 0:
             current_frame_idx = (self.frame_count // self.animation_speed) % self.total_frames
-            current_char, current_alpha = self.character_frames[current_frame_idx]
-            
-            try:
-                frame_copy = self._blend_with_alpha(frame_copy, current_char, current_alpha, 
-                                                  char_x, char_y)
-            except Exception as e:
-                print(f"绘制角色时出错: {e}")
+            self._blend_character(frame, self.character_premultiplied[current_frame_idx],
+                                  self.character_inv_alpha[current_frame_idx], char_x, char_y)
         
-        # 绘制进度文字
+        # 绘制进度文字（文字和描边按内容预渲染为遮罩并缓存）
         progress_text = f"{progress*100:.1f}%"
-        text_size_info = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 
-                                        self.text_size, 2)[0]
+        text_mask, outline_mask, text_size_info = self._get_text_sprite(progress_text)
         
         # 计算文字位置 - 跟随进度条移动
         if self.text_position == 'follow':
@@ -565,28 +939,73 @@ class VideoProgressBar:
         
         text_y = bar_y + (self.bar_height + text_size_info[1]) // 2 + self.text_offset_y
         
+        # 遮罩左上角相对文字基线起点的偏移
+        sprite_x = text_x - self._text_padding
+        sprite_y = text_y - text_size_info[1] - self._text_padding
+
         # 文字描边效果
-        if self.text_outline:
-            # 绘制描边（多方向偏移）
-            outline_offsets = []
-            thickness = self.text_outline_thickness
-            for dx in range(-thickness, thickness + 1):
-                for dy in range(-thickness, thickness + 1):
-                    if dx != 0 or dy != 0:  # 排除中心点
-                        outline_offsets.append((dx, dy))
-
-            # 绘制所有描边
-            for offset in outline_offsets:
-                cv2.putText(frame_copy, progress_text,
-                           (text_x + offset[0], text_y + offset[1]),
-                           cv2.FONT_HERSHEY_SIMPLEX, self.text_size,
-                           self.text_outline_color, 2)
+        if outline_mask is not None:
+            self._paste_mask(frame, outline_mask, self.text_outline_color, sprite_x, sprite_y)
 
         # 主文字
-        cv2.putText(frame_copy, progress_text, (text_x, text_y),
-                   cv2.FONT_HERSHEY_SIMPLEX, self.text_size, self.text_color, 2)
-        
-        return frame_copy
+        self._paste_mask(frame, text_mask, self.text_color, sprite_x, sprite_y)
+
+        return frame
+
+    def _set_channel_order(self, rgb: bool) -> None:
+        """
+        切换绘制时使用的通道顺序（默认BGR）
+
+        切换到RGB后可以直接在moviepy解码出的RGB帧上绘制，省去逐帧两次整帧的cvtColor。
+        配置中的颜色仍按BGR书写，这里只是把所有绘制颜色和预计算的颜色数组翻转一次。
+        """
+        if rgb == self._rgb_mode:
+            return
+
+        for name in ('bar_color', 'background_color', 'border_color', 'text_color',
+                     'text_outline_color', 'particle_color', 'lightning_color'):
+            setattr(self, name, tuple(getattr(self, name))[::-1])
+        if self.gradient_lut is not None:
+            self.gradient_lut = np.ascontiguousarray(self.gradient_lut[:, ::-1])
+        self.character_premultiplied = np.ascontiguousarray(self.character_premultiplied[..., ::-1])
+
+        # 依赖颜色的缓存全部失效
+        self._gradient_row_cache = {}
+        self._bar_background = None
+        self._bar_strip_key = None
+        self._rgb_mode = rgb
+
+    def _create_frame_renderer(self, width: int, height: int, duration: float):
+        """
+        创建逐帧渲染函数：RGB解码帧 -> 叠加进度条 -> RGB输出帧（缓冲按分辨率预分配）
+
+        会把绘制切换到RGB通道顺序（见 _set_channel_order），直接在输出缓冲上绘制。
+        """
+        self._set_channel_order(rgb=True)
+
+        # 轮换使用的RGB输出缓冲：数量覆盖编码队列中尚未写出的帧，避免被提前覆盖
+        output_buffers = [np.empty((height, width, 3), dtype=np.uint8)
+                          for _ in range(_QueuedVideoWriter.PENDING_FRAMES)]
+        frame_index = 0
+
+        def process_frame(frame, t):
+            """处理单个帧的函数"""
+            nonlocal frame_index
+
+            # 解码帧只读，复制到轮换的输出缓冲后直接在上面绘制
+            frame_rgb = output_buffers[frame_index % len(output_buffers)]
+            frame_index += 1
+
+            # 解码时已指定 iter_frames(dtype='uint8')，帧总是uint8(0-255)，无需逐帧检查类型
+            np.copyto(frame_rgb, frame)
+
+            # 计算进度
+            progress = t / duration if duration > 0 else 0
+
+            # 添加进度条
+            return self._draw_progress_bar(frame_rgb, progress, width, height)
+
+        return process_frame
 
     def process_video(self, input_video: str, output_video: Optional[str] = None) -> str:
         """
@@ -603,214 +1022,259 @@ class VideoProgressBar:
             FileNotFoundError: 输入视频文件不存在
             ValueError: 视频处理过程中出错
         """
-        if not os.path.exists(input_video):
-            raise FileNotFoundError(f"视频文件不存在: {input_video}")
-
-        # 检查文件格式
-        supported_formats = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-        file_ext = os.path.splitext(input_video)[1].lower()
-        if file_ext not in supported_formats:
-            print(f"⚠️ 警告: 文件格式 {file_ext} 可能不被支持，支持的格式: {', '.join(supported_formats)}")
-
-        # 检查文件大小
-        file_size = os.path.getsize(input_video)
-        if file_size > 500 * 1024 * 1024:  # 500MB
-            print(f"⚠️ 警告: 视频文件较大 ({file_size / 1024 / 1024:.1f}MB)，处理可能需要较长时间和大量内存")
-        
-        # 改进输出路径处理
-        if output_video is None:
-            # 在原视频同目录生成，避免硬编码路径
-            input_dir = os.path.dirname(input_video)
-            if not input_dir:  # 如果输入视频在当前目录
-                input_dir = "."
-            name, ext = os.path.splitext(os.path.basename(input_video))
-            output_video = os.path.join(input_dir, f"{name}_progress{ext}")
-        
-        # 确保输出目录存在
-        output_dir = os.path.dirname(output_video)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        
-        # 使用moviepy加载视频并保留音频
-        print("🎬 正在加载视频（包含音频）...")
-        try:
-            video_clip = VideoFileClip(input_video)
-        except Exception as e:
-            raise ValueError(f"无法加载视频文件 {input_video}: {e}")
+        _check_input_video(input_video)
+        output_video = _resolve_output_path(input_video, output_video)
 
-        fps = video_clip.fps
-        width, height = video_clip.size
-        duration = video_clip.duration
+        video_clip, fps, width, height, duration = _open_video(input_video)
+        _print_video_info(video_clip, fps, width, height, duration)
+        print(f"  角色动画帧数: {self.total_frames}")
 
-        # 检查视频基本信息的有效性
-        if fps <= 0 or width <= 0 or height <= 0 or duration <= 0:
-            video_clip.close()
-            raise ValueError(f"视频文件信息无效: fps={fps}, size={width}x{height}, duration={duration}")
+        process_frame = self._create_frame_renderer(width, height, duration)
+        try:
+            _render_outputs(video_clip, [(process_frame, output_video, self.encoder, self.encoder_preset)])
+        finally:
+            # 恢复默认的BGR绘制，保证直接调用 _draw_progress_bar 时颜色正确
+            self._set_channel_order(rgb=False)
 
-        total_frames = int(fps * duration)
+        # 清理资源
+        video_clip.close()
 
-        print(f"📊 视频信息:")
-        print(f"  分辨率: {width}x{height}")
-        print(f"  帧率: {fps:.1f} FPS")
-        print(f"  时长: {duration:.2f} 秒")
-        print(f"  总帧数: {total_frames}")
-        print(f"  角色动画帧数: {self.total_frames}")
-        print(f"  音频: {'✅ 包含' if video_clip.audio else '❌ 无音频'}")
+        print(f"🎉 视频处理完成! 输出文件: {output_video}")
 
-        print("🎮 正在处理视频帧...")
+        return output_video
 
-        # 创建进度条
-        progress_bar = tqdm(total=total_frames, desc="处理视频帧", unit="帧",
-                           bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]')
 
-        processed_frames = 0
+def _check_input_video(input_video: str) -> None:
+    """检查输入视频是否存在，并对格式和文件大小给出提示"""
+    if not os.path.exists(input_video):
+        raise FileNotFoundError(f"视频文件不存在: {input_video}")
+
+    # 检查文件格式
+    supported_formats = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
+    file_ext = os.path.splitext(input_video)[1].lower()
+    if file_ext not in supported_formats:
+        print(f"⚠️ 警告: 文件格式 {file_ext} 可能不被支持，支持的格式: {', '.join(supported_formats)}")
+
+    # 检查文件大小
+    file_size = os.path.getsize(input_video)
+    if file_size > 500 * 1024 * 1024:  # 500MB
+        print(f"⚠️ 警告: 视频文件较大 ({file_size / 1024 / 1024:.1f}MB)，处理可能需要较长时间和大量内存")
+
+
+def _resolve_output_path(input_video: str, output_video: Optional[str]) -> str:
+    """确定输出路径（默认在输入文件同目录生成）并确保输出目录存在"""
+    # 改进输出路径处理
+    if output_video is None:
+        # 在原视频同目录生成，避免硬编码路径
+        input_dir = os.path.dirname(input_video)
+        if not input_dir:  # 如果输入视频在当前目录
+            input_dir = "."
+        name, ext = os.path.splitext(os.path.basename(input_video))
+        output_video = os.path.join(input_dir, f"{name}_progress{ext}")
+
+    # 确保输出目录存在
+    output_dir = os.path.dirname(output_video)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    return output_video
+
+
+def _open_video(input_video: str) -> Tuple[VideoFileClip, float, int, int, float]:
+    """使用moviepy加载视频（保留音频），返回 (clip, fps, width, height, duration)"""
+    print("🎬 正在加载视频（包含音频）...")
+    try:
+        video_clip = VideoFileClip(input_video)
+    except Exception as e:
+        raise ValueError(f"无法加载视频文件 {input_video}: {e}")
+
+    fps = video_clip.fps
+    width, height = video_clip.size
+    duration = video_clip.duration
+
+    # 检查视频基本信息的有效性
+    if fps <= 0 or width <= 0 or height <= 0 or duration <= 0:
+        video_clip.close()
+        raise ValueError(f"视频文件信息无效: fps={fps}, size={width}x{height}, duration={duration}")
+    return video_clip, fps, width, height, duration
 
-        def process_frame(get_frame, t):
-            """处理单个帧的函数"""
-            nonlocal processed_frames
 
-            frame = get_frame(t)
-            # MoviePy 2.x 直接返回uint8格式(0-255)，无需乘以255
-            if frame.dtype == np.float64 or frame.dtype == np.float32:
-                # 如果是浮点数(0-1)，转换为uint8
-                frame_bgr = cv2.cvtColor((frame * 255).astype(np.uint8), cv2.COLOR_RGB2BGR)
-            else:
-                # 如果已经是uint8(0-255)，直接转换
-                frame_bgr = cv2.cvtColor(frame.astype(np.uint8), cv2.COLOR_RGB2BGR)
+def _print_video_info(video_clip: VideoFileClip, fps: float, width: int, height: int, duration: float) -> None:
+    """打印视频基本信息"""
+    print(f"📊 视频信息:")
+    print(f"  分辨率: {width}x{height}")
+    print(f"  帧率: {fps:.1f} FPS")
+    print(f"  时长: {duration:.2f} 秒")
+    print(f"  总帧数: {int(fps * duration)}")
+    print(f"  音频: {'✅ 包含' if video_clip.audio else '❌ 无音频'}")
 
-            # 计算进度
-            progress = t / duration if duration > 0 else 0
 
-            # 添加进度条
-            frame_with_progress = self._draw_progress_bar(frame_bgr, progress, width, height)
+def _close_writers(writers: List['_QueuedVideoWriter']) -> Optional[Exception]:
+    """关闭全部写入器（某个关闭失败也继续关闭其余的），返回第一个关闭错误"""
+    first_error = None
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            if first_error is None:
+                first_error = e
+    return first_error
 
-            # 转换回RGB给moviepy，MoviePy 2.x 期望uint8格式
-            frame_rgb = cv2.cvtColor(frame_with_progress, cv2.COLOR_BGR2RGB)
 
-            # 更新进度条
-            processed_frames += 1
-            progress_bar.update(1)
+def _render_outputs(video_clip: VideoFileClip, renderers: List[Tuple[Any, str, str, Optional[str]]]) -> None:
+    """
+    解码一次源视频，把每一帧依次交给各个渲染函数，并分别编码到各自的输出文件
 
-            return frame_rgb.astype(np.uint8)
+    Args:
+        video_clip: 已打开的源视频
+        renderers: [(process_frame, output_video, encoder, encoder_preset), ...]，
+            process_frame(frame, t) 返回RGB输出帧
+    """
+    fps = video_clip.fps
+    width, height = video_clip.size
+    total_frames = int(fps * video_clip.duration)
 
-        # 创建新的视频剪辑，应用进度条处理 (MoviePy 2.x API)
-        processed_clip = video_clip.transform(process_frame)
+    print("🎮 正在处理视频帧...")
 
-        # 保留原始音频 (MoviePy 2.x API)
+    # 创建进度条
+    progress_bar = tqdm(total=total_frames, desc="处理视频帧", unit="帧",
+                       bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 先单独导出原始音频，写视频时直接复制音轨（与 write_videofile 的做法一致）
+        audio_file = None
         if video_clip.audio:
-            processed_clip = processed_clip.with_audio(video_clip.audio)
+            audio_file = os.path.join(temp_dir, 'audio.mp3')
+            video_clip.audio.write_audiofile(audio_file, fps=44100, logger=None)
             print("🔊 保留原始音频")
 
         print("💾 正在写入最终视频...")
 
-        # 写入视频，并指定高质量参数 (MoviePy 2.x API)
-        processed_clip.write_videofile(
-            output_video,
-            fps=fps,
-            codec='libx264',      # 使用高质量和兼容性好的H.264编码器
-            bitrate='10000k',     # 设置一个较高的码率 (例如 10000 kbps)。原视频码率越高，这里可以设得越高。
-            preset='medium',      # 'slow'或'veryslow'可以获得更高压缩率（同等码率下质量更好），但耗时更长。'medium'是很好的平衡点。
-            threads=4,            # 使用多个CPU核心来加速编码
-            logger=None           # MoviePy 2.x: 使用logger代替verbose参数
-        )
+        # 解码、渲染、编码三段流水线：解码和各路编码各占一个后台线程，通过有界队列衔接
+        writers = []
+        try:
+            for _, output_video, encoder, preset in renderers:
+                writers.append(_open_writer(output_video, (width, height), fps, audio_file, encoder, preset))
 
-        # 关闭进度条
-        progress_bar.close()
+            frames = video_clip.iter_frames(fps=fps, with_times=True, dtype='uint8')
+            for t, frame in _iter_in_thread(frames):
+                # 解码帧只读，各渲染函数先复制到自己的输出缓冲再绘制，互不影响
+                for (process_frame, *_), writer in zip(renderers, writers):
+                    writer.write(process_frame(frame, t))
+                progress_bar.update(1)
+        except BaseException:
+            # 渲染过程出错：仍关闭全部写入器，关闭时的错误不覆盖原始异常
+            _close_writers(writers)
+            raise
 
-        # 清理资源
-        processed_clip.close()
-        video_clip.close()
+        close_error = _close_writers(writers)
+        if close_error is not None:
+            raise close_error
 
-        print(f"🎉 视频处理完成! 输出文件: {output_video}")
+    # 关闭进度条
+    progress_bar.close()
 
-        return output_video
 
-    def _get_gradient_color(self, ratio):
-        """根据比例获取多色渐变中的颜色"""
-        if not self.gradient_colors or len(self.gradient_colors) < 2:
-            return self.bar_color
+def process_video_multi(input_video: str, outputs: Dict[str, Optional[Dict[str, Any]]]) -> List[str]:
+    """
+    只解码一次源视频，同时生成多个不同配置的进度条视频
 
-        # 确保ratio在0-1范围内
-        ratio = max(0, min(1, ratio))
+    每个输出使用独立的 VideoProgressBar（粒子、帧计数等状态互不干扰），
+    共享同一路解码和同一份导出的音频，各自在后台线程中编码。
 
-        # 计算在哪两个颜色之间
-        num_colors = len(self.gradient_colors)
-        segment_size = 1.0 / (num_colors - 1)
-        segment_index = int(ratio / segment_size)
+    Args:
+        input_video: 输入视频文件路径
+        outputs: {输出视频路径: 配置字典}，配置为 None 时使用默认配置
+
+    Returns:
+        List[str]: 输出视频文件路径列表（与 outputs 顺序一致）
+
+    Raises:
+        FileNotFoundError: 输入视频文件不存在
+        ValueError: 视频处理过程中出错
+    """
+    if not outputs:
+        raise ValueError("outputs 不能为空")
 
-        # 防止越界
-        if segment_index >= num_colors - 1:
-            return tuple(self.gradient_colors[-1])
+    _check_input_video(input_video)
+    output_videos = [_resolve_output_path(input_video, output_video) for output_video in outputs]
+    processors = [VideoProgressBar(config) for config in outputs.values()]
 
-        # 计算在当前段内的位置
-        local_ratio = (ratio - segment_index * segment_size) / segment_size
+    video_clip, fps, width, height, duration = _open_video(input_video)
+    _print_video_info(video_clip, fps, width, height, duration)
+    print(f"  输出数量: {len(output_videos)}")
 
-        # 获取当前段的起始和结束颜色
-        start_color = self.gradient_colors[segment_index]
-        end_color = self.gradient_colors[segment_index + 1]
+    renderers = [(processor._create_frame_renderer(width, height, duration), output_video,
+                  processor.encoder, processor.encoder_preset)
+                 for processor, output_video in zip(processors, output_videos)]
+    _render_outputs(video_clip, renderers)
 
-        # 线性插值计算颜色
-        interpolated_color = []
-        for i in range(3):  # BGR三个通道
-            start_val = start_color[i]
-            end_val = end_color[i]
-            interpolated_val = int(start_val + (end_val - start_val) * local_ratio)
-            interpolated_color.append(interpolated_val)
+    # 清理资源
+    video_clip.close()
 
-        return tuple(interpolated_color)
+    print(f"🎉 视频处理完成! 输出文件: {', '.join(output_videos)}")
+
+    return output_videos
 
 
 def load_config(config_path: str) -> Dict[str, Any]:
-    """从JSON文件加载配置"""
-    if os.path.exists(config_path):
+    """从JSON文件加载配置（文件不存在时返回空配置）"""
+    try:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
-    return {}
+    except FileNotFoundError:
+        return {}
+
+
+_DEFAULT_CONFIG = {  # save_default_config 写出的默认配置（模块级常量，只构建一次）
+    "input_video": "assets/samples/sample_video.mp4",
+    "output_video": "",
+    
+    "bar_height": 40,
+    "bar_color": [0, 255, 255],
+    "background_color": [50, 50, 50],
+    "position": "bottom",
+    "margin": 25,
+    
+    "character_path": "assets/characters/pikaqiu.gif",
+    "character_size": [60, 60],
+    "character_offset_x": 0,
+    "character_offset_y": -5,
+    
+    "enable_bounce": True,
+    "bounce_amplitude": 8,
+    "bounce_speed": 0.2,
+    "animation_speed": 3,
+    
+    "enable_lightning": True,
+    "lightning_chance": 0.3,
+    "lightning_color": [0, 255, 255],
+    
+    "enable_particles": True,
+    "particle_color": [0, 255, 255],
+    "particle_lifetime": 60,
+    
+    "text_color": [0, 255, 255],
+    "text_size": 0.8,
+    "text_position": "follow",
+    "text_offset_x": 0,
+    "text_offset_y": -10,
+    
+    "border_thickness": 3,
+    "border_color": [255, 255, 255],
+    "gradient_enabled": True,
+    "glow_enabled": True
+}
+
+
+@lru_cache(maxsize=1)
+def _default_config_json() -> str:
+    """默认配置的JSON文本（只序列化一次）"""
+    return json.dumps(_DEFAULT_CONFIG, indent=2, ensure_ascii=False)
 
 
 def save_default_config(config_path: str):
     """保存默认配置到JSON文件"""
-    default_config = {
-        "input_video": "assets/samples/sample_video.mp4",
-        "output_video": "",
-        
-        "bar_height": 40,
-        "bar_color": [0, 255, 255],
-        "background_color": [50, 50, 50],
-        "position": "bottom",
-        "margin": 25,
-        
-        "character_path": "assets/characters/pikaqiu.gif",
-        "character_size": [60, 60],
-        "character_offset_x": 0,
-        "character_offset_y": -5,
-        
-        "enable_bounce": True,
-        "bounce_amplitude": 8,
-        "bounce_speed": 0.2,
-        "animation_speed": 3,
-        
-        "enable_lightning": True,
-        "lightning_chance": 0.3,
-        "lightning_color": [0, 255, 255],
-        
-        "enable_particles": True,
-        "particle_color": [0, 255, 255],
-        "particle_lifetime": 60,
-        
-        "text_color": [0, 255, 255],
-        "text_size": 0.8,
-        "text_position": "follow",
-        "text_offset_x": 0,
-        "text_offset_y": -10,
-        
-        "border_thickness": 3,
-        "border_color": [255, 255, 255],
-        "gradient_enabled": True,
-        "glow_enabled": True
-    }
-    
     with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(default_config, f, indent=2, ensure_ascii=False)
+        f.write(_default_config_json())
     
     print(f"💾 默认配置已保存到: {config_path}")